@@ -1,13 +1,20 @@
 """ReAct agent implementation for RabbitAI"""
 
-import signal
-from typing import Dict
+import asyncio
+from contextlib import contextmanager, suppress
+from typing import Dict, List, Optional
 from rich.spinner import Spinner
 from rich.live import Live
 
-from .baseagent import BaseAgent, TimeoutError, timeout_handler
+from .baseagent import (
+    run_sync, BaseAgent, REACT_SUFFIX_TEMPLATE
+)
+from .history import HistoryEntry
 from ..logger import log_info, log_debug, log_warning, log_error
 
+# Quick commands usually finish within this window - no point speculating past them
+SPECULATION_GRACE_SECONDS = 0.25
+
 
 class ReactAgent(BaseAgent):
     """Simple ReAct (Reasoning + Acting) agent for CLI troubleshooting"""
@@ -21,6 +28,14 @@ class ReactAgent(BaseAgent):
             config: Configuration dictionary
         """
         super().__init__(llm, config)
+        # Shared live spinner display (see _live_display)
+        self._live = None
+        self._spinner = None
+        self.speculative_execution = config.get('agent', {}).get('speculative_execution', True)
+
+        # Detect system context now (cached per process) rather than on the first query
+        self.system_context.get_shell_info()
+        self.system_context.get_common_commands()
         log_info(f"ReactAgent initialized - max_iterations={self.max_iterations}, llm_timeout={self.llm_timeout}s")
 
     def solve(self, user_query: str) -> str:
@@ -33,122 +48,359 @@ class ReactAgent(BaseAgent):
         Returns:
             Final answer string
         """
-        log_info(f"Starting ReAct solve loop for query: {user_query[:100]}")
+        return run_sync(self.asolve(user_query))
 
-        history = []
+    def solve_many(self, queries: List[str]) -> List[str]:
+        """
+        Solve several independent queries in lockstep.
+
+        Each iteration sends the prompts of all unfinished loops to the LLM in
+        one invoke_batch call, then runs the resulting commands.
+
+        Args:
+            queries: List of user questions
+
+        Returns:
+            Final answer strings, in the same order as queries
+        """
+        log_info(f"Starting batched ReAct solve for {len(queries)} queries")
+        with self._live_display():
+            return self._solve_batched(queries)
+
+    def _solve_batched(self, queries: List[str]) -> List[str]:
+        """Lockstep loop behind solve_many"""
+
+        # Read the cached system context per call so SystemContext.invalidate() takes effect
         os_info = self.system_context.get_os_info()
-        shell_info = self.system_context.get_shell_info()
-        available_commands = self.system_context.get_common_commands()
+        loops = [{
+            "user_query": query,
+            "prompt_prefix": self._context_prompt_prefix(query),
+            "history": [],
+            "history_buf": [],
+            "answer": None
+        } for query in queries]
 
-        # Main ReAct loop
         for iteration in range(self.max_iterations):
-            log_debug(f"ReAct iteration {iteration + 1}/{self.max_iterations}")
-            # Show separator between iterations (not for first iteration)
-            if iteration > 0:
-                self.console.print("\n[dim]" + "─" * 50 + "[/dim]\n")
+            active = [loop for loop in loops if loop["answer"] is None]
+            if not active:
+                break
 
-            # Format history for prompt
-            history_str = self._format_history(history)
+            log_debug(f"Batched ReAct iteration {iteration + 1}/{self.max_iterations} ({len(active)} active)")
+            if iteration > 0 and self._interactive:
+                self.console.print("\n[dim]" + "─" * 50 + "[/dim]\n")
 
-            # Show loading animation while LLM is thinking
-            spinner = Spinner("dots", text="[color(136)]Thinking...[/color(136)]", style="color(136)")
+            prompts = [self._build_prompt(loop["prompt_prefix"], loop["history_buf"]) for loop in active]
 
-            # Get next action from LLM with timeout
             try:
-                # Set alarm for timeout (Unix only)
-                if hasattr(signal, 'SIGALRM'):
-                    signal.signal(signal.SIGALRM, timeout_handler)
-                    signal.alarm(self.llm_timeout)
+                log_debug(f"Calling LLM API with a batch of {len(prompts)} prompts...")
+                self._set_status(f"Thinking... (step {iteration + 1})")
+                results = self._call_with_timeout(self.llm.invoke_batch, prompts)
+            except Exception as e:
+                log_error(f"Error getting batched LLM response on iteration {iteration + 1}: {e}")
+                self.console.print(f"[yellow]⚠ Error getting LLM response: {e}[/yellow]")
+                for loop in active:
+                    loop["answer"] = f"I encountered an error while processing your query: {str(e)}"
+                break
+
+            for loop, result in zip(active, results):
+                try:
+                    decision = self._parse_decision(result.content)
+                except Exception as e:
+                    log_error(f"Error parsing LLM response on iteration {iteration + 1}: {e}")
+                    loop["answer"] = f"I encountered an error while processing your query: {str(e)}"
+                    continue
+
+                history = loop["history"]
+                loop["answer"] = self._record_decision(history, decision, iteration)
+                if loop["answer"] is not None:
+                    continue
+
+                if history[-1].commands is not None:
+                    self._record_results(history[-1], run_sync(self._arun_commands(history[-1].commands)))
+                elif history[-1].command is not None:
+                    command = history[-1].command
+                    with self._paused_for(command):
+                        result = self.executor.execute(command, os_info)
+                    self._record_result(history[-1], result)
+                loop["history_buf"].append(self._format_entry(history[-1]))
+
+        for loop in loops:
+            if loop["answer"] is None:
+                log_warning(f"Max iterations ({self.max_iterations}) reached without final answer")
+                loop["answer"] = self._generate_timeout_response(loop["history"], loop["user_query"])
+
+        return [loop["answer"] for loop in loops]
+
+    async def asolve_many(self, queries: List[str]) -> List[str]:
+        """
+        Async variant of solve_many - runs one ReAct loop per query via asyncio.gather.
+
+        Args:
+            queries: List of user questions
+
+        Returns:
+            Final answer strings, in the same order as queries
+        """
+        return list(await asyncio.gather(*(self.asolve(query) for query in queries)))
+
+    @contextmanager
+    def _live_display(self):
+        """Show one spinner for a whole solve (concurrent loops share the outermost display; none off-terminal)"""
+        if self._live is not None or not self._interactive:
+            yield
+            return
+
+        self._spinner = Spinner("dots", text="[color(136)]Thinking...[/color(136)]", style="color(136)")
+        try:
+            with Live(self._spinner, console=self.console, transient=True, auto_refresh=True) as live:
+                self._live = live
+                yield
+        finally:
+            self._live = None
+            self._spinner = None
+
+    def _set_status(self, text: str) -> None:
+        """Swap the spinner label"""
+        if self._spinner is not None:
+            self._spinner.update(text=f"[color(136)]{text}[/color(136)]")
+
+    @contextmanager
+    def _paused_for(self, command: str):
+        """Pause the live display while the executor may prompt the user about command"""
+        live = self._live
+        if live is None or not self.executor.needs_confirmation(command):
+            yield
+            return
+
+        live.stop()
+        try:
+            yield
+        finally:
+            live.start()
+
+    async def asolve(self, user_query: str) -> str:
+        """
+        Async ReAct loop - LLM calls are awaited so several loops can share one event loop.
+
+        Args:
+            user_query: The user's question or problem
+
+        Returns:
+            Final answer string
+        """
+        log_info(f"Starting ReAct solve loop for query: {user_query[:100]}")
+        with self._live_display():
+            return await self._asolve(user_query)
+
+    async def _asolve(self, user_query: str) -> str:
+        """ReAct loop behind asolve"""
+        history = []
+        # Formatted text of every finished history entry, appended once per entry
+        history_buf = []
+        prompt_prefix = self._context_prompt_prefix(user_query)
+
+        # Command still running from the previous iteration: (history entry, task)
+        pending = None
+
+        try:
+            # Main ReAct loop
+            for iteration in range(self.max_iterations):
+                log_debug(f"ReAct iteration {iteration + 1}/{self.max_iterations}")
+                # Show separator between iterations (not for first iteration)
+                if iteration > 0 and self._interactive:
+                    self.console.print("\n[dim]" + "─" * 50 + "[/dim]\n")
+
+                # Only overlap the next LLM call with a command that is still running
+                if pending is not None and self.speculative_execution:
+                    await asyncio.wait({pending[1]}, timeout=SPECULATION_GRACE_SECONDS)
+                if pending is not None and (not self.speculative_execution or pending[1].done()):
+                    await self._resolve_pending(pending, history_buf)
+                    pending = None
 
+                # Get next action from LLM with timeout
                 try:
-                    # Format the prompt
-                    formatted_prompt = self.react_prompt.format(
-                        user_query=user_query,
-                        os_type=os_info["type"],
-                        os_version=os_info["release"],
-                        shell_type=shell_info["type"],
-                        available_commands=", ".join(available_commands[:20]),
-                        history=history_str
-                    )
-
-                    # Show spinner while getting LLM response
-                    log_debug("Calling LLM API...")
-                    with Live(spinner, console=self.console, transient=True):
-                        result = self.llm.invoke(formatted_prompt)
-                    log_debug(f"LLM response received (length: {len(result.content)} chars)")
-
-                    # Cancel alarm
-                    if hasattr(signal, 'SIGALRM'):
-                        signal.alarm(0)
-
-                except TimeoutError:
+                    self._set_status(f"Thinking... (step {iteration + 1})")
+                    prompt = self._build_prompt(prompt_prefix, history_buf, pending)
+                    decision = await self._next_decision(prompt)
+
+                    if pending is not None:
+                        # Decision was made against a placeholder - land the real result first
+                        entry = pending[0]
+                        await self._resolve_pending(pending, history_buf)
+                        pending = None
+
+                        if self._depends_on(decision, entry.command):
+                            log_debug("Speculative decision depends on pending command output, re-asking LLM")
+                            prompt = self._build_prompt(prompt_prefix, history_buf)
+                            decision = await self._next_decision(prompt)
+                        else:
+                            log_debug("Speculative decision accepted")
+
+                except asyncio.TimeoutError:
                     log_warning(f"LLM API timeout after {self.llm_timeout}s on iteration {iteration + 1}")
                     self.console.print(f"[yellow]⚠ LLM API timed out after {self.llm_timeout} seconds[/yellow]")
                     return f"The AI assistant timed out while processing your query. The issue might be too complex or the API is slow. Please try again or simplify your query."
 
-                # Parse LLM decision
-                decision = self._parse_decision(result.content)
-                log_debug(f"LLM decision: action={decision['action']}, thought={decision.get('thought', '')[:50]}")
+                except Exception as e:
+                    log_error(f"Error getting LLM response on iteration {iteration + 1}: {e}")
+                    self.console.print(f"[yellow]⚠ Error getting LLM response: {e}[/yellow]")
+                    return f"I encountered an error while processing your query: {str(e)}"
 
-            except Exception as e:
-                if hasattr(signal, 'SIGALRM'):
-                    signal.alarm(0)  # Cancel alarm on error
-                log_error(f"Error getting LLM response on iteration {iteration + 1}: {e}")
-                self.console.print(f"[yellow]⚠ Error getting LLM response: {e}[/yellow]")
-                return f"I encountered an error while processing your query: {str(e)}"
-
-            # Don't show thoughts - removed
-            # Don't show iteration count - removed
-
-            # Add to history
-            history.append({
-                "iteration": iteration + 1,
-                "thought": decision["thought"],
-                "action": decision["action"]
-            })
-
-            # Execute action
-            if decision["action"] == "final_answer":
-                answer = decision.get("answer", "I don't have enough information to answer that.")
-                log_info(f"ReAct completed with final_answer (length: {len(answer)} chars)")
-                return answer
-
-            elif decision["action"] == "execute_command":
-                command = decision.get("command", "")
-                if not command:
-                    log_warning("execute_command action but no command provided")
-                    continue
+                answer = self._record_decision(history, decision, iteration)
+                if answer is not None:
+                    return answer
 
-                log_info(f"Executing command: {command}")
-                self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{command}[/color(136)]")
+                if history[-1].commands is not None:
+                    # Independent diagnostics - run them together and wait for all of them
+                    self._set_status(f"Running {len(history[-1].commands)} commands...")
+                    self._record_results(history[-1], await self._arun_commands(history[-1].commands))
+                elif history[-1].command is not None:
+                    command = history[-1].command
+
+                    # Safety checks/confirmation happen now; the command itself runs in the background
+                    blocked = self._preflight(command)
+                    if blocked is not None:
+                        self._record_result(history[-1], blocked)
+                    else:
+                        history[-1].pending = True
+                        pending = (history[-1], asyncio.create_task(self.executor.arun(command)))
+
+                # Pending entries are formatted once their command finishes
+                if not history[-1].pending:
+                    history_buf.append(self._format_entry(history[-1]))
 
-                # Execute command
-                result = self.executor.execute(command, os_info)
-                log_debug(f"Command result: success={result['success']}, blocked={result['blocked']}")
-
-                # Add observation to history
-                history[-1]["command"] = command
-                history[-1]["result"] = {
-                    "success": result["success"],
-                    "output": result["output"][:1000],
-                    "error": result["error"][:500] if result["error"] else ""
-                }
-
-                # Display result
-                if result["blocked"]:
-                    self.console.print(f"[color(202)]✗ Blocked:[/color(202)] {result['error']}")
-                elif result["success"]:
-                    output_preview = result["output"][:200].strip()
-                    if len(result["output"]) > 200:
-                        output_preview += "..."
-                    self.console.print(f"[color(244)]  Output:[/color(244)] {output_preview}")
-                else:
-                    self.console.print(f"[color(202)]✗ Error:[/color(202)] {result['error'][:200]}")
-
-            else:
-                log_warning(f"Unknown action type: {decision['action']}")
-                self.console.print(f"[yellow]⚠ Unknown action: {decision['action']}[/yellow]")
+            if pending is not None:
+                await self._resolve_pending(pending, history_buf)
+                pending = None
+
+        finally:
+            if pending is not None and not pending[1].done():
+                pending[1].cancel()
+                # Let the task see the cancellation so arun kills the subprocess
+                with suppress(asyncio.CancelledError):
+                    await pending[1]
 
         # Max iterations reached
         log_warning(f"Max iterations ({self.max_iterations}) reached without final answer")
-        return self._generate_timeout_response(history, user_query)
+        self._set_status("Summarizing...")
+        return await asyncio.to_thread(self._generate_timeout_response, history, user_query)
+
+    def _preflight(self, command: str) -> Optional[Dict]:
+        """Safety checks/confirmation, with the live display paused if the user gets prompted"""
+        with self._paused_for(command):
+            return super()._preflight(command)
+
+    def _record_decision(self, history: List[HistoryEntry], decision: Dict, iteration: int) -> Optional[str]:
+        """
+        Add an LLM decision to the history.
+
+        Args:
+            history: History list to append to
+            decision: Parsed LLM decision
+            iteration: Zero-based iteration index
+
+        Returns:
+            The final answer if the decision ends the loop, otherwise None.
+            For execute_command the new entry carries the command to run,
+            for execute_commands the list of commands.
+        """
+        # Don't show thoughts - removed
+        # Don't show iteration count - removed
+
+        # Add to history
+        history.append(HistoryEntry(
+            iteration=iteration + 1,
+            thought=decision["thought"],
+            action=decision["action"]
+        ))
+
+        if decision["action"] == "final_answer":
+            answer = decision.get("answer", "I don't have enough information to answer that.")
+            log_info(f"ReAct completed with final_answer (length: {len(answer)} chars)")
+            return answer
+
+        if decision["action"] == "execute_command":
+            command = decision.get("command", "")
+            if not command:
+                log_warning("execute_command action but no command provided")
+                return None
+
+            log_info(f"Executing command: {command}")
+            self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{command}[/color(136)]")
+            history[-1].command = command
+        elif decision["action"] == "execute_commands":
+            commands = [command for command in decision.get("commands", []) if command]
+            if not commands:
+                log_warning("execute_commands action but no commands provided")
+                return None
+
+            log_info(f"Executing {len(commands)} commands in parallel: {commands}")
+            for command in commands:
+                self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{command}[/color(136)]")
+            history[-1].commands = commands
+        else:
+            log_warning(f"Unknown action type: {decision['action']}")
+            self.console.print(f"[yellow]⚠ Unknown action: {decision['action']}[/yellow]")
+
+        return None
+
+    def _context_prompt_prefix(self, user_query: str) -> str:
+        """Render the prompt prefix from the current (cached) system context"""
+        return self._render_prompt_prefix(
+            user_query,
+            self.system_context.get_os_info(),
+            self.system_context.get_shell_info(),
+            ", ".join(self.system_context.get_common_commands()[:20])
+        )
+
+    def _build_prompt(self, prompt_prefix: str, history_buf: List[str], pending=None) -> str:
+        """Append the already formatted history (plus any pending placeholder) to the prompt prefix"""
+        entries = history_buf
+        if pending is not None:
+            entries = history_buf + [self._format_entry(pending[0])]
+
+        return prompt_prefix + REACT_SUFFIX_TEMPLATE.format(history=self._join_history(entries))
+
+    async def _next_decision(self, prompt: str) -> Dict:
+        """Ask the LLM for the next action and parse it (raises asyncio.TimeoutError on timeout)"""
+        log_debug("Calling LLM API...")
+        content = await asyncio.wait_for(self._astream_response(prompt), timeout=self.llm_timeout)
+        log_debug(f"LLM response received (length: {len(content)} chars)")
+
+        # Parse LLM decision
+        decision = self._parse_decision(content)
+        log_debug(f"LLM decision: action={decision['action']}, thought={decision.get('thought', '')[:50]}")
+        return decision
+
+    async def _resolve_pending(self, pending, history_buf: List[str]) -> None:
+        """Wait for a background command, patch its result into the history entry and format it"""
+        entry, task = pending
+        result = await task
+        entry.pending = False
+        self._record_result(entry, result)
+        history_buf.append(self._format_entry(entry))
+
+    @staticmethod
+    def _depends_on(decision: Dict, command: str) -> bool:
+        """
+        Dependency guard for speculative decisions.
+
+        Args:
+            decision: Decision the LLM made while the command output was still pending
+            command: The pending command
+
+        Returns:
+            True if the decision needs the command's real output and must be re-asked
+        """
+        if decision["action"] == "execute_command":
+            next_commands = [decision.get("command", "")]
+        elif decision["action"] == "execute_commands":
+            next_commands = decision.get("commands", [])
+        else:
+            return True
+
+        if any(next_command.strip() == command.strip() for next_command in next_commands):
+            return True
+
+        thought = decision.get("thought", "")
+        return command in thought or "pending" in thought.lower()
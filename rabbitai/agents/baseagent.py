@@ -1,48 +1,141 @@
 """Base agent class for RabbitAI ReAct agents"""
 
+import asyncio
+import functools
 import json
-import signal
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-from langchain_core.prompts import ChatPromptTemplate
-from rich.console import Console
-
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Dict, Any, Optional
+from .history import HistoryEntry, Observation
 from ..tools.executor import CommandExecutor
 from ..context.system import SystemContext
+from ..textscan import most_significant_command
 from ..logger import log_info, log_debug, log_warning, log_error
 
+try:
+    # Optional speedup - orjson parses in C; its JSONDecodeError subclasses json.JSONDecodeError
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+def _extract_json(response: str) -> str:
+    """
+    Locate the JSON object in a response wrapped in a code fence or prose.
+
+    Uses str.find to slice the candidate once instead of regex backtracking
+    or split() intermediates.
+
+    Args:
+        response: Raw LLM response
+
+    Returns:
+        The fenced object, else the outermost {...} span, else the stripped response
+    """
+    # JSON object inside a markdown code fence, with or without a json tag
+    start = response.find("```")
+    if start >= 0:
+        start += 3
+        if response.startswith("json", start):
+            start += 4
+        end = response.find("```", start)
+        candidate = (response[start:end] if end >= 0 else response[start:]).strip()
+        if candidate.startswith("{"):
+            return candidate
+
+    # Fallback: outermost braces anywhere in the response
+    first = response.find("{")
+    last = response.rfind("}")
+    if first >= 0 and last > first:
+        return response[first:last + 1]
+    return response.strip()
+
+
+# Event loop reused by the sync entry points of each thread (see run_sync)
+_sync_loops = threading.local()
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Unlike asyncio.run, the same event loop is reused across calls in a
+    thread. Async clients that bind to the loop they were first used on
+    (e.g. the Gemini gRPC channel) therefore stay valid between solve()
+    calls, while each thread still gets its own loop.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        RuntimeError: If called while an event loop is running in this thread
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("solve() cannot be called from a running event loop - await asolve() instead")
 
-class TimeoutError(Exception):
-    """Raised when LLM API call times out"""
-    pass
+    loop = getattr(_sync_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _sync_loops.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
 
 
-def timeout_handler(_signum, _frame):
-    raise TimeoutError("LLM API call timed out")
+# How much command output/error text is kept in the prompt history
+HISTORY_OUTPUT_CHARS = 500
+HISTORY_ERROR_CHARS = 200
 
+# How much command output/error text is previewed on the console
+DISPLAY_CHARS = 200
 
-class BaseAgent(ABC):
-    """Base class for ReAct agents with common functionality"""
+TRUNCATED = "…[truncated]"
 
-    def __init__(self, llm, config: Dict):
-        """
-        Initialize base agent.
 
-        Args:
-            llm: LLM instance (Gemini or Ollama)
-            config: Configuration dictionary
-        """
-        self.llm = llm
-        self.config = config
-        self.executor = CommandExecutor(config)
-        self.system_context = SystemContext()
-        self.max_iterations = config.get('agent', {}).get('max_iterations', 10)
-        self.llm_timeout = config.get('llm', {}).get('timeout_seconds', 30)
-        self.console = Console()
+def _truncate(text: str, limit: int, keep_tail: bool = False) -> str:
+    """
+    Shorten text to limit characters, marking where it was cut.
+
+    Args:
+        text: Text to shorten
+        limit: Maximum number of characters kept from text
+        keep_tail: Keep the end of the text instead of the start
 
-        # ReAct prompt template (shared across all agents)
-        self.react_prompt = ChatPromptTemplate.from_template("""
-You are RabbitAI, a CLI assistant. You help users find files, diagnose issues, and perform system tasks by running shell commands.
+    Returns:
+        text unchanged if it fits, otherwise the kept part plus a truncation marker
+    """
+    if len(text) <= limit:
+        return text
+    if keep_tail:
+        return TRUNCATED + text[-limit:]
+    return text[:limit] + TRUNCATED
+
+
+# Most commands one execute_commands step may ask for (extra ones are dropped)
+MAX_BATCH_COMMANDS = 5
+
+# Most commands of one execute_commands step that run at the same time
+MAX_PARALLEL_COMMANDS = 8
+
+# Stand-in for a result that was never recorded
+_NO_RESULT = Observation(success=False)
+
+# History text used before the first action
+EMPTY_HISTORY = "No previous actions yet. This is your first step."
+
+# Default number of most recent steps kept in the prompt (plus the first step)
+DEFAULT_HISTORY_WINDOW = 5
+HISTORY_OMITTED = "… [{count} earlier steps omitted] …"
+
+# Static part of the ReAct prompt - identical for every iteration of a solve() call
+REACT_PREFIX_TEMPLATE = """You are RabbitAI, a CLI assistant. You help users find files, diagnose issues, and perform system tasks by running shell commands.
 Use the ReAct (Reasoning + Acting) pattern to solve the user's problem.
 
 SYSTEM INFORMATION:
@@ -52,15 +145,13 @@ SYSTEM INFORMATION:
 
 USER QUERY: {user_query}
 
-PREVIOUS ACTIONS AND OBSERVATIONS:
-{history}
-
 INSTRUCTIONS:
 Based on the user query and previous observations, decide your next action.
 
 You can either:
 1. Execute a command to gather more information
-2. Provide a final answer if you have enough information
+2. Execute several independent commands at once (up to {max_batch_commands}) when none of them needs another's output
+3. Provide a final answer if you have enough information
 
 IMPORTANT:
 - Use commands appropriate for {os_type}
@@ -72,12 +163,127 @@ IMPORTANT:
 Respond in JSON format:
 {{
     "thought": "your reasoning about what to do next and why",
-    "action": "execute_command" or "final_answer",
+    "action": "execute_command", "execute_commands" or "final_answer",
     "command": "the command to run (only if action is execute_command)",
+    "commands": ["independent commands to run in parallel (only if action is execute_commands)"],
     "answer": "your final answer to the user (only if action is final_answer)"
 }}
 
-Make sure your response is valid JSON.""")
+Example of gathering several independent diagnostics in one step:
+{{"thought": "Check the kernel, disk and memory together", "action": "execute_commands", "commands": ["uname -a", "df -h", "free -m"]}}
+
+Make sure your response is valid JSON."""
+
+# Per-iteration part of the ReAct prompt - only the history changes
+REACT_SUFFIX_TEMPLATE = """
+
+PREVIOUS ACTIONS AND OBSERVATIONS:
+{history}
+
+Respond with your next action as valid JSON."""
+
+
+@functools.cache
+def _react_prompt():
+    """
+    Compile the ReAct ChatPromptTemplate once per process (langchain imported on first use).
+
+    The system message is the prefix rendered once per solve (see
+    _render_prompt_prefix) and the user turn is the history, so chat
+    providers see an identical leading segment on every iteration.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages([
+        ("system", "{prompt_prefix}"),
+        ("human", REACT_SUFFIX_TEMPLATE.strip())
+    ])
+
+
+class JsonStreamScanner:
+    """Tracks streamed LLM text and reports when the first top-level JSON object is complete"""
+
+    def __init__(self):
+        self.text = ""
+        self.start = 0
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next chunk of streamed text.
+
+        A balanced {...} span only counts once it parses, so braces in prose
+        before the object (e.g. "Sure {ok} here: {...}") don't end the stream.
+
+        Args:
+            text: Newly received text
+
+        Returns:
+            True once the closing brace of the first JSON object has been seen
+        """
+        offset = len(self.text)
+        self.text += text
+        for i, char in enumerate(text, offset):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == "{":
+                if not self.started:
+                    self.start = i
+                    self.started = True
+                self.depth += 1
+            elif not self.started:
+                # Prose or code fence before the object
+                continue
+            elif char == '"':
+                self.in_string = True
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        _json_loads(self.text[self.start:i + 1])
+                        return True
+                    except ValueError:
+                        # Braces in prose - keep looking for the object
+                        self.started = False
+        return False
+
+
+class BaseAgent(ABC):
+    """Base class for ReAct agents with common functionality"""
+
+    def __init__(self, llm, config: Dict):
+        """
+        Initialize base agent.
+
+        Args:
+            llm: LLM instance (Gemini or Ollama)
+            config: Configuration dictionary
+        """
+        self.llm = llm
+        self.config = config
+        self.executor = CommandExecutor(config)
+        self.system_context = SystemContext()
+        self.max_iterations = config.get('agent', {}).get('max_iterations', 10)
+        self.llm_timeout = config.get('llm', {}).get('timeout_seconds', 30)
+        # Prompt history keeps the first and the last history_window steps (0 = keep all)
+        self.history_window = config.get('agent', {}).get('history_window', DEFAULT_HISTORY_WINDOW)
+        from rich.console import Console
+        self.console = Console()
+        # Spinners and separators only make sense on a terminal (not in pipes, CI or servers)
+        self._interactive = self.console.is_terminal
+
+        # Worker threads for bounded sync LLM calls (see _call_with_timeout)
+        self._llm_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rabbitai-llm")
+
+        # ReAct prompt template (compiled once, shared across all agents)
+        self.react_prompt = _react_prompt()
 
     @abstractmethod
     def solve(self, user_query: str) -> str:
@@ -93,6 +299,58 @@ Make sure your response is valid JSON.""")
         """
         pass
 
+    async def _astream_response(self, prompt: Any, on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Stream the LLM response, stopping as soon as the decision JSON object is complete.
+
+        Args:
+            prompt: Prompt string or chat messages
+            on_text: Optional callback receiving each chunk of text as it arrives
+
+        Returns:
+            The response text received so far
+        """
+        chunks = []
+        scanner = JsonStreamScanner()
+        stream = self.llm.astream(prompt)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk.content)
+                if on_text is not None:
+                    on_text(chunk.content)
+                if scanner.feed(chunk.content):
+                    # Anything after the closing brace is fences/prose - stop decoding it
+                    log_debug("Decision JSON complete, closing LLM stream early")
+                    break
+        finally:
+            await stream.aclose()
+
+        return "".join(chunks)
+
+    def _call_with_timeout(self, call: Callable, *args) -> Any:
+        """
+        Make a synchronous LLM call, giving up after llm_timeout seconds.
+
+        The call runs on a worker thread so this works off the main thread and
+        on every platform; the provider client's own timeout aborts the HTTP request.
+
+        Args:
+            call: LLM method to call (e.g. self.llm.invoke)
+            *args: Arguments for call
+
+        Returns:
+            Whatever call returns
+
+        Raises:
+            TimeoutError: If no response arrived in time
+        """
+        future = self._llm_pool.submit(call, *args)
+        try:
+            return future.result(timeout=self.llm_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"LLM API call timed out after {self.llm_timeout}s")
+
     def _parse_decision(self, response: str) -> Dict[str, Any]:
         """
         Parse LLM response into structured decision.
@@ -107,36 +365,171 @@ Make sure your response is valid JSON.""")
             ValueError: If response cannot be parsed
         """
         try:
-            # Handle markdown code blocks
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
+            try:
+                # Constrained decoding (Gemini JSON mode, Ollama format=json) returns bare JSON
+                decision = _json_loads(response)
+            except json.JSONDecodeError:
+                # Handle markdown code blocks and prose around the JSON object
+                decision = _json_loads(_extract_json(response))
 
-            decision = json.loads(json_str)
+            if not isinstance(decision, dict):
+                raise ValueError(f"Expected a JSON object\nResponse: {response[:200]}")
 
-            # Validate required fields
-            if "action" not in decision:
-                raise ValueError("Missing 'action' field")
+            return self._validate_decision(decision)
 
-            if decision["action"] == "execute_command" and "command" not in decision:
-                raise ValueError("Missing 'command' field for execute_command action")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON response: {e}\nResponse: {response[:200]}")
 
-            if decision["action"] == "final_answer" and "answer" not in decision:
-                raise ValueError("Missing 'answer' field for final_answer action")
+    def _validate_decision(self, decision: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check a decision has the fields its action needs.
 
-            # Set defaults
-            if "thought" not in decision:
-                decision["thought"] = "Processing..."
+        Args:
+            decision: Decision dictionary (parsed JSON or structured output)
 
-            return decision
+        Returns:
+            The decision, with defaults filled in
 
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON response: {e}\nResponse: {response[:200]}")
+        Raises:
+            ValueError: If a required field is missing or has the wrong type
+        """
+        # Validate required fields
+        if "action" not in decision:
+            raise ValueError("Missing 'action' field")
+
+        if decision["action"] == "execute_command":
+            command = decision.get("command")
+            if command is not None and not isinstance(command, str):
+                raise ValueError("'command' must be a command string")
+            # Absent, null or blank - handled downstream as "no command"
+            decision["command"] = (command or "").strip()
+
+        if decision["action"] == "execute_commands":
+            commands = decision.get("commands")
+            if not isinstance(commands, list):
+                raise ValueError("Missing 'commands' list for execute_commands action")
+            if not all(isinstance(command, str) and command.strip() for command in commands):
+                raise ValueError("'commands' must be a list of non-empty command strings")
+            if len(commands) > MAX_BATCH_COMMANDS:
+                log_warning(f"execute_commands asked for {len(commands)} commands - running the first {MAX_BATCH_COMMANDS}")
+                decision["commands"] = commands[:MAX_BATCH_COMMANDS]
+
+        if decision["action"] == "final_answer" and "answer" not in decision:
+            raise ValueError("Missing 'answer' field for final_answer action")
+
+        # Set defaults
+        if "thought" not in decision:
+            decision["thought"] = "Processing..."
+
+        return decision
+
+    def _render_prompt_prefix(self, user_query: str, os_info: Dict, shell_info: Dict,
+                              available_commands: str) -> str:
+        """
+        Render the static part of the ReAct prompt once per solve() call.
+
+        Args:
+            user_query: The user's question or problem
+            os_info: Operating system information
+            shell_info: Shell information
+            available_commands: Comma-separated commands available on the system
+
+        Returns:
+            Prompt prefix string (append REACT_SUFFIX_TEMPLATE for each iteration)
+        """
+        return REACT_PREFIX_TEMPLATE.format(
+            user_query=user_query,
+            os_type=os_info["type"],
+            os_version=os_info["release"],
+            shell_type=shell_info["type"],
+            available_commands=available_commands,
+            max_batch_commands=MAX_BATCH_COMMANDS
+        )
+
+    def _make_observation(self, result: Dict) -> Observation:
+        """
+        Build the history copy of a command result, truncated once to what the prompt uses.
+
+        Entries are immutable after they are recorded, so _format_entry can use
+        the stored text as-is instead of re-slicing it on every iteration.
+
+        Args:
+            result: Result dictionary from CommandExecutor
+
+        Returns:
+            Observation with success, output and error
+        """
+        # Errors keep their tail - the actual failure is usually reported last
+        return Observation(
+            success=result["success"],
+            output=_truncate(result["output"], HISTORY_OUTPUT_CHARS),
+            error=_truncate(result["error"], HISTORY_ERROR_CHARS, keep_tail=True)
+        )
+
+    def _preflight(self, command: str) -> Optional[Dict[str, Any]]:
+        """
+        Run the executor's safety checks and confirmation for a command.
+
+        Args:
+            command: The command to check
+
+        Returns:
+            A blocked execution result, or None if the command may run
+        """
+        return self.executor.preflight(command)
 
-    def _format_history(self, history: List[Dict]) -> str:
+    async def _arun_commands(self, commands: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run independent commands concurrently.
+
+        Safety checks and confirmations happen one at a time first (they may
+        prompt the user); the approved commands then run in parallel.
+
+        Args:
+            commands: Commands from an execute_commands decision
+
+        Returns:
+            Execution results, in the same order as commands
+        """
+        results = [self._preflight(command) for command in commands]
+        approved = [i for i, result in enumerate(results) if result is None]
+
+        # Bound the number of subprocesses alive at once
+        limit = asyncio.Semaphore(MAX_PARALLEL_COMMANDS)
+
+        async def run(command: str) -> Dict[str, Any]:
+            async with limit:
+                return await self.executor.arun(command)
+
+        outcomes = await asyncio.gather(*(run(commands[i]) for i in approved))
+        for i, outcome in zip(approved, outcomes):
+            results[i] = outcome
+        return results
+
+    def _record_result(self, entry: HistoryEntry, result: Dict) -> None:
+        """Add a command observation to its history entry and display it"""
+        entry.result = self._make_observation(result)
+        self._display_result(result)
+
+    def _record_results(self, entry: HistoryEntry, results: List[Dict]) -> None:
+        """Add the observations of an execute_commands step to its history entry and display them"""
+        entry.results = [self._make_observation(result) for result in results]
+        for result in results:
+            self._display_result(result)
+
+    def _display_result(self, result: Dict) -> None:
+        """Print a short preview of a command result"""
+        log_debug(f"Command result: success={result['success']}, blocked={result['blocked']}")
+
+        if result["blocked"]:
+            self.console.print(f"[color(202)]✗ Blocked:[/color(202)] {result['error']}")
+        elif result["success"]:
+            output_preview = _truncate(result["output"], DISPLAY_CHARS).strip()
+            self.console.print(f"[color(244)]  Output:[/color(244)] {output_preview}")
+        else:
+            self.console.print(f"[color(202)]✗ Error:[/color(202)] {_truncate(result['error'], DISPLAY_CHARS)}")
+
+    def _format_history(self, history: List[HistoryEntry]) -> str:
         """
         Format history for prompt.
 
@@ -147,29 +540,96 @@ Make sure your response is valid JSON.""")
             Formatted history string
         """
         if not history:
-            return "No previous actions yet. This is your first step."
+            return EMPTY_HISTORY
 
-        formatted = []
-        for entry in history:
-            formatted.append(f"\n--- Iteration {entry['iteration']} ---")
-            formatted.append(f"Thought: {entry['thought']}")
-            formatted.append(f"Action: {entry['action']}")
+        # Only format the entries that survive the window
+        kept = self._window(history)
+        return "\n".join(
+            entry if isinstance(entry, str) else self._format_entry(entry) for entry in kept
+        )
 
-            if "command" in entry:
-                formatted.append(f"Command: {entry['command']}")
-                result = entry.get('result', {})
-                formatted.append(f"Success: {result.get('success', False)}")
+    def _join_history(self, entries: List[str]) -> str:
+        """
+        Join already formatted history entries for the prompt, applying the history window.
 
-                if result.get('output'):
-                    output = result['output'][:500]
-                    formatted.append(f"Output: {output}")
+        Args:
+            entries: Formatted history entries, oldest first
 
-                if result.get('error'):
-                    formatted.append(f"Error: {result['error'][:200]}")
+        Returns:
+            History text for the prompt
+        """
+        if not entries:
+            return EMPTY_HISTORY
 
-        return "\n".join(formatted)
+        return "\n".join(self._window(entries))
 
-    def _generate_timeout_response(self, history: List[Dict], user_query: str) -> str:
+    def _window(self, entries: List[Any]) -> List[Any]:
+        """
+        Keep the first entry (original context) and the last history_window entries.
+
+        Args:
+            entries: History entries (records or formatted strings), oldest first
+
+        Returns:
+            Kept entries, with an omission marker in place of the dropped ones
+        """
+        window = self.history_window
+        if not window or len(entries) <= window + 1:
+            return entries
+
+        omitted = len(entries) - window - 1
+        return [entries[0], HISTORY_OMITTED.format(count=omitted), *entries[-window:]]
+
+    def _format_entry(self, entry: HistoryEntry) -> str:
+        """
+        Format a single history entry for the prompt.
+
+        Args:
+            entry: One history entry
+
+        Returns:
+            Formatted entry string
+        """
+        # Build the entry with one join over its parts instead of one string per line
+        header = f"\n--- Iteration {entry.iteration} ---\nThought: {entry.thought}\nAction: {entry.action}"
+        if entry.commands is not None:
+            return header + self._format_command_results(entry)
+        command = entry.command
+        if command is None:
+            return header
+
+        if entry.pending:
+            # Command is still running (speculative overlap) - result patched in later
+            return f"{header}\nCommand: {command}\nOutput: <pending result for command: {command}>"
+
+        result = entry.result or _NO_RESULT
+        output = result.output
+        error = result.error
+        return "".join((
+            header,
+            "\nCommand: ", command,
+            "\nSuccess: ", str(result.success),
+            "\nOutput: " if output else "", output,
+            "\nError: " if error else "", error
+        ))
+
+    def _format_command_results(self, entry: HistoryEntry) -> str:
+        """Format the commands of an execute_commands entry with their numbered results"""
+        results = entry.results or []
+        parts = []
+        for i, command in enumerate(entry.commands, 1):
+            result = results[i - 1] if i <= len(results) else _NO_RESULT
+            output = result.output
+            error = result.error
+            parts.append("".join((
+                f"\nCommand {i}: ", command,
+                f"\nSuccess {i}: ", str(result.success),
+                f"\nOutput {i}: " if output else "", output,
+                f"\nError {i}: " if error else "", error
+            )))
+        return "".join(parts)
+
+    def _generate_timeout_response(self, history: List[HistoryEntry], user_query: str) -> str:
         """
         Generate response when max iterations reached.
 
@@ -192,14 +652,32 @@ Query: {user_query}
 Steps taken:
 {self._format_history(history)}
 
-Provide a concise summary (2-3 sentences) of the findings."""
+Provide a concise summary (2-3 sentences) of the findings.
+
+Respond in JSON format:
+{{
+    "thought": "what the steps revealed",
+    "action": "final_answer",
+    "answer": "your summary"
+}}"""
+
+            response = self._call_with_timeout(self.llm.invoke, summary_prompt)
+
+            # JSON-constrained providers answer in the decision format; others may reply in prose
+            try:
+                summary = self._parse_decision(response.content).get("answer") or response.content
+            except ValueError:
+                summary = response.content
 
-            response = self.llm.invoke(summary_prompt)
-            return f"I've completed my diagnostic steps. Here's what I found:\n\n{response.content}"
+            return f"I've completed my diagnostic steps. Here's what I found:\n\n{summary}"
 
         except Exception:
-            # Fallback if LLM fails
-            return (
+            # Fallback if LLM fails - point at the step that reported the most errors/warnings
+            fallback = (
                 f"I've completed {len(history)} diagnostic steps but need more time to fully resolve this. "
                 "Based on what I've found so far, you may want to run additional diagnostics manually."
             )
+            command = most_significant_command(history)
+            if command is not None:
+                fallback += f" The most relevant output came from: {command}"
+            return fallback
@@ -0,0 +1,16 @@
+"""Structured ReAct decision schema for RabbitAI agents"""
+
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class Decision(BaseModel):
+    """One ReAct step - what the LLM decided to do next"""
+
+    thought: str = Field(description="Your reasoning about what to do next and why")
+    action: Literal["execute_command", "execute_commands", "final_answer"]
+    command: Optional[str] = Field(default=None, description="The command to run (only if action is execute_command)")
+    commands: Optional[List[str]] = Field(
+        default=None, description="Independent commands to run in parallel (only if action is execute_commands)"
+    )
+    answer: Optional[str] = Field(default=None, description="Your final answer to the user (only if action is final_answer)")
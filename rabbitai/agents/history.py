@@ -0,0 +1,32 @@
+"""Typed ReAct history records for RabbitAI agents"""
+
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+# __slots__ keeps records compact (dataclass slots need Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class Observation:
+    """Outcome of one command, truncated to what the prompt uses"""
+    success: bool
+    output: str = ""
+    error: str = ""
+
+
+@dataclass(**_SLOTS)
+class HistoryEntry:
+    """One ReAct step - the LLM's decision and what running it produced"""
+    iteration: int
+    thought: str
+    action: str
+    # execute_command
+    command: Optional[str] = None
+    result: Optional[Observation] = None
+    # Command still running in the background (speculative overlap)
+    pending: bool = False
+    # execute_commands
+    commands: Optional[List[str]] = None
+    results: Optional[List[Observation]] = None
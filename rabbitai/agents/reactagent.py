@@ -1,14 +1,26 @@
 """LangGraph-based ReAct agent implementation for RabbitAI"""
 
-import signal
-from typing import List, Dict, Any, TypedDict
-from langgraph.graph import StateGraph, END
+import asyncio
+import functools
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Dict, Any, Optional, TypedDict, TYPE_CHECKING
 from rich.spinner import Spinner
 from rich.live import Live
+from rich.markup import escape
 
-from .baseagent import BaseAgent, TimeoutError, timeout_handler
+from .baseagent import run_sync, BaseAgent
+from .history import HistoryEntry
+from ..llm_cache import LLMCache
 from ..logger import log_info, log_debug, log_warning, log_error
 
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph.state import CompiledStateGraph
+
+# How much of the streamed LLM response is previewed next to the spinner
+STREAM_PREVIEW_CHARS = 80
+
 
 class AgentState(TypedDict):
     """State for the LangGraph agent"""
@@ -16,7 +28,10 @@ class AgentState(TypedDict):
     os_info: Dict[str, str]
     shell_info: Dict[str, str]
     available_commands: List[str]
-    history: List[Dict[str, Any]]
+    history: List[HistoryEntry]
+    # Prompt text of each finished step, formatted once
+    formatted_history: List[str]
+    prompt_prefix: str
     iteration: int
     max_iterations: int
     llm_timeout: int
@@ -37,95 +52,186 @@ class ReactAgent(BaseAgent):
         """
         super().__init__(llm, config)
 
-        # Build the graph
-        self.graph = self._build_graph()
+        # Decisions for prompts already seen (identical prompt -> identical next action)
+        llm_config = config.get('llm', {})
+        self.llm_cache = None
+        if llm_config.get('cache', True):
+            self.llm_cache = LLMCache(
+                max_entries=llm_config.get('cache_max_entries', 256),
+                ttl_secs=llm_config.get('cache_ttl_seconds', 3600),
+                db_path=llm_config.get('cache_db')
+            )
+
+        # Detect system context now (cached per process) rather than on the first query
+        self.system_context.get_shell_info()
+        self.system_context.get_common_commands()
+
+        # Provider-side structured output when available, otherwise stream + _parse_decision
+        from .decision import Decision
+        try:
+            self.structured_llm = llm.with_structured_output(Decision)
+        except (AttributeError, NotImplementedError):
+            self.structured_llm = None
+
+        # Optional LangGraph checkpointer - persists every step under a thread id
+        agent_config = config.get('agent', {})
+        self.thread_id = agent_config.get('session_id', 'default')
+        self.checkpoint_db = agent_config.get('checkpoint_db')
+        self.checkpointer = None
+
+        # Shared compiled graph, fetched on first use (see _aget_graph)
+        self.graph = None
         log_info(f"LangGraphReactAgent initialized - max_iterations={self.max_iterations}, llm_timeout={self.llm_timeout}s")
 
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph StateGraph"""
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _compiled_graph(cls) -> "CompiledStateGraph":
+        """
+        Build and compile the LangGraph StateGraph once per class.
+
+        The node is not bound to an agent - it finds the running agent in the
+        run config (see _run_config), so every instance shares this graph.
+        """
+        # LangGraph is only needed once an agent is created
+        from langgraph.graph import StateGraph, END
 
         # Create the graph
         workflow = StateGraph(AgentState)
 
-        # Add nodes
-        workflow.add_node("agent", self._agent_node)
-        workflow.add_node("execute_command", self._execute_command_node)
+        # Single node - the agent runs its own commands, saving a transition (and checkpoint) per iteration
+        workflow.add_node("agent", cls._agent_step)
 
         # Set entry point
         workflow.set_entry_point("agent")
 
-        # Add conditional edges
+        # Loop back to the agent until it finishes
         workflow.add_conditional_edges(
             "agent",
-            self._should_continue,
+            cls._should_continue,
             {
-                "execute": "execute_command",
+                "continue": "agent",
                 "end": END
             }
         )
 
-        # Execute command goes back to agent
-        workflow.add_edge("execute_command", "agent")
-
         return workflow.compile()
 
-    def _agent_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _agent_step(state: AgentState, config: "RunnableConfig") -> AgentState:
+        """Graph node - dispatch to the agent running this graph"""
+        return await config["configurable"]["agent"]._a_agent_node(state)
+
+    async def _aget_graph(self) -> "CompiledStateGraph":
+        """Get the shared compiled graph, attaching this agent's checkpointer on first use"""
+        if self.graph is None:
+            # The SQLite saver binds to the running event loop, so it is created here rather than in __init__
+            self.checkpointer = self._build_checkpointer(self.checkpoint_db)
+            graph = self._compiled_graph()
+            # Copying swaps in the checkpointer without recompiling
+            self.graph = graph.copy({"checkpointer": self.checkpointer}) if self.checkpointer else graph
+        return self.graph
+
+    @staticmethod
+    def _build_checkpointer(checkpoint_db: Optional[str]):
+        """
+        Create the checkpointer for agent.checkpoint_db (call with an event loop running).
+
+        Args:
+            checkpoint_db: SQLite file path, ":memory:" or None (no checkpointing)
+
+        Returns:
+            AsyncSqliteSaver when langgraph-checkpoint-sqlite is installed,
+            otherwise an in-memory MemorySaver; None when checkpointing is off
+        """
+        if not checkpoint_db:
+            return None
+
+        if checkpoint_db != ":memory:":
+            try:
+                import aiosqlite
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            except ImportError:
+                log_warning("langgraph-checkpoint-sqlite not installed - checkpoints are kept in memory only")
+            else:
+                path = Path(checkpoint_db).expanduser()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                log_info(f"Checkpointing LangGraph state to {path}")
+                return AsyncSqliteSaver(aiosqlite.connect(str(path)))
+
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+
+    def close(self) -> None:
+        """Release the decision cache and checkpointer database connections (call before exiting)"""
+        run_sync(self.aclose())
+
+    async def aclose(self) -> None:
+        """Async variant of close"""
+        if self.llm_cache is not None:
+            self.llm_cache.close()
+
+        conn = getattr(self.checkpointer, "conn", None)
+        self.checkpointer = None
+        self.graph = None
+        if conn is not None:
+            # Finishes queued writes, then stops the connection's worker thread
+            await conn.close()
+            log_debug("Checkpoint database closed")
+
+    def _run_config(self, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """LangGraph run config selecting the agent and the checkpoint thread"""
+        return {"configurable": {"agent": self, "thread_id": thread_id or self.thread_id}}
+
+    async def _a_agent_node(self, state: AgentState) -> AgentState:
         """Agent reasoning node - decides next action"""
 
         log_debug(f"LangGraph agent_node - iteration {state['iteration'] + 1}/{state['max_iterations']}")
 
         # Show separator between iterations (not for first iteration)
-        if state["iteration"] > 0:
+        if state["iteration"] > 0 and self._interactive:
             self.console.print("\n[dim]" + "─" * 50 + "[/dim]\n")
 
-        # Format history for prompt
-        history_str = self._format_history(state["history"])
+        # Steps are formatted once when they finish (see _append_history); only the window is joined
+        history_str = self._join_history(state["formatted_history"])
 
         # Show loading animation
         spinner = Spinner("dots", text="[color(136)]Thinking...[/color(136)]", style="color(136)")
 
         # Get next action from LLM with timeout
         try:
-            # Set alarm for timeout (Unix only)
-            if hasattr(signal, 'SIGALRM'):
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(state["llm_timeout"])
-
             try:
-                # Format the prompt
-                formatted_prompt = self.react_prompt.format(
-                    user_query=state["user_query"],
-                    os_type=state["os_info"]["type"],
-                    os_version=state["os_info"]["release"],
-                    shell_type=state["shell_info"]["type"],
-                    available_commands=", ".join(state["available_commands"][:20]),
+                # Format the prompt (system prefix rendered once per solve + history turn)
+                formatted_prompt = self.react_prompt.format_messages(
+                    prompt_prefix=state["prompt_prefix"],
                     history=history_str
                 )
 
-                # Show spinner while getting LLM response
-                log_debug("Calling LLM API...")
-                with Live(spinner, console=self.console, transient=True):
-                    result = self.llm.invoke(formatted_prompt)
-                log_debug(f"LLM response received (length: {len(result.content)} chars)")
-
-                # Cancel alarm
-                if hasattr(signal, 'SIGALRM'):
-                    signal.alarm(0)
-
-            except TimeoutError:
+                cache_key = None
+                decision = None
+                if self.llm_cache is not None:
+                    cache_key = self.llm_cache.cache_key(self.llm, formatted_prompt)
+                    decision = self.llm_cache.get(cache_key)
+
+                if decision is not None:
+                    log_info("LLM cache hit - skipped API call")
+                    # Already cached
+                    cache_key = None
+                else:
+                    log_debug("Calling LLM API...")
+                    decision = await asyncio.wait_for(
+                        self._request_decision(formatted_prompt, spinner), timeout=state["llm_timeout"]
+                    )
+
+            except asyncio.TimeoutError:
                 log_warning(f"LLM API timeout after {state['llm_timeout']}s on iteration {state['iteration'] + 1}")
                 self.console.print(f"[yellow]⚠ LLM API timed out after {state['llm_timeout']} seconds[/yellow]")
                 state["final_answer"] = "The AI assistant timed out while processing your query. The issue might be too complex or the API is slow. Please try again or simplify your query."
                 state["should_continue"] = False
                 return state
 
-            # Parse LLM decision
-            decision = self._parse_decision(result.content)
             log_debug(f"LLM decision: action={decision['action']}, thought={decision.get('thought', '')[:50]}")
 
         except Exception as e:
-            if hasattr(signal, 'SIGALRM'):
-                signal.alarm(0)
             log_error(f"Error getting LLM response on iteration {state['iteration'] + 1}: {e}")
             self.console.print(f"[yellow]⚠ Error getting LLM response: {e}[/yellow]")
             state["final_answer"] = f"I encountered an error while processing your query: {str(e)}"
@@ -136,11 +242,11 @@ class ReactAgent(BaseAgent):
         state["iteration"] += 1
 
         # Add to history
-        history_entry = {
-            "iteration": state["iteration"],
-            "thought": decision["thought"],
-            "action": decision["action"]
-        }
+        history_entry = HistoryEntry(
+            iteration=state["iteration"],
+            thought=decision["thought"],
+            action=decision["action"]
+        )
 
         if decision["action"] == "final_answer":
             answer = decision.get("answer", "I don't have enough information to answer that.")
@@ -151,72 +257,119 @@ class ReactAgent(BaseAgent):
             command = decision.get("command", "")
             if command:
                 log_info(f"Executing command: {command}")
-                history_entry["command"] = command
+                history_entry.command = command
                 state["history"].append(history_entry)
                 state["should_continue"] = True
             else:
                 log_warning("execute_command action but no command provided")
                 # No command provided, continue
                 state["should_continue"] = True
+        elif decision["action"] == "execute_commands":
+            commands = [command for command in decision.get("commands", []) if command]
+            if commands:
+                log_info(f"Executing {len(commands)} commands in parallel: {commands}")
+                history_entry.commands = commands
+                state["history"].append(history_entry)
+            else:
+                log_warning("execute_commands action but no commands provided")
+            state["should_continue"] = True
         else:
             log_warning(f"Unknown action type: {decision['action']}")
             self.console.print(f"[yellow]⚠ Unknown action: {decision['action']}[/yellow]")
             state["should_continue"] = True
 
+        recorded = bool(state["history"]) and state["history"][-1] is history_entry
+
+        # Only cache decisions that change the history - one that doesn't (no command, unknown
+        # action) would be replayed for the identical next prompt on every remaining iteration
+        if cache_key is not None and (recorded or decision["action"] == "final_answer"):
+            self.llm_cache.put(cache_key, decision)
+
+        # Run the command(s) here rather than in a separate node
+        if recorded and state["iteration"] < state["max_iterations"]:
+            await self._aexecute_entry(state, history_entry)
+
         # Check max iterations
         if state["iteration"] >= state["max_iterations"]:
             log_warning(f"Max iterations ({state['max_iterations']}) reached without final answer")
             state["should_continue"] = False
             if not state["final_answer"]:
-                state["final_answer"] = self._generate_timeout_response_state(state)
+                # Summary call is synchronous - keep it off the event loop
+                state["final_answer"] = await asyncio.to_thread(self._generate_timeout_response_state, state)
 
         return state
 
-    def _execute_command_node(self, state: AgentState) -> AgentState:
-        """Execute command node"""
-
-        log_debug("LangGraph execute_command_node")
-
-        # Get the last history entry with the command
-        if not state["history"]:
-            return state
-
-        last_entry = state["history"][-1]
-        command = last_entry.get("command", "")
-
-        if not command:
-            return state
+    async def _request_decision(self, prompt: Any, spinner: Spinner) -> Dict[str, Any]:
+        """
+        Get the next decision from the LLM while showing the spinner.
 
-        self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{command}[/color(136)]")
+        Args:
+            prompt: Formatted chat messages
+            spinner: Spinner to display during the call
 
-        # Execute command
-        result = self.executor.execute(command, state["os_info"])
-        log_debug(f"Command result: success={result['success']}, blocked={result['blocked']}")
+        Returns:
+            Validated decision dictionary
 
-        # Add observation to history
-        last_entry["result"] = {
-            "success": result["success"],
-            "output": result["output"][:1000],
-            "error": result["error"][:500] if result["error"] else ""
-        }
+        Raises:
+            ValueError: If the response is not a valid decision
+        """
+        display = Live(spinner, console=self.console, transient=True) if self._interactive else nullcontext()
+        with display:
+            if self.structured_llm is not None:
+                # Constrained decoding - the provider returns a Decision, no text to parse
+                result = await self.structured_llm.ainvoke(prompt)
+                log_debug("Structured LLM response received")
+                return self._validate_decision(result.model_dump(exclude_none=True))
+
+            # Stream, showing the tail of the response next to the spinner
+            content = await self._astream_response(prompt, self._stream_preview(spinner))
+
+        log_debug(f"LLM response received (length: {len(content)} chars)")
+        return self._parse_decision(content)
+
+    @staticmethod
+    def _stream_preview(spinner: Spinner):
+        """Build an on_text callback that shows the last part of the streamed response next to the spinner"""
+        tail = ""
+
+        def on_text(text: str) -> None:
+            nonlocal tail
+            tail = (tail + text)[-STREAM_PREVIEW_CHARS:]
+            preview = escape(" ".join(tail.split()))
+            spinner.update(text=f"[color(136)]Thinking...[/color(136)] [color(244)]{preview}[/color(244)]")
+
+        return on_text
+
+    async def _aexecute_entry(self, state: AgentState, entry: HistoryEntry) -> None:
+        """
+        Run the command(s) of a history entry and record the observation.
 
-        # Display result
-        if result["blocked"]:
-            self.console.print(f"[color(202)]✗ Blocked:[/color(202)] {result['error']}")
-        elif result["success"]:
-            output_preview = result["output"][:200].strip()
-            if len(result["output"]) > 200:
-                output_preview += "..."
-            self.console.print(f"[color(244)]  Output:[/color(244)] {output_preview}")
+        Args:
+            state: Current agent state (history text is extended)
+            entry: History entry holding the command or commands to run
+        """
+        if entry.commands is not None:
+            # Independent diagnostics - run them together
+            for command in entry.commands:
+                self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{command}[/color(136)]")
+            self._record_results(entry, await self._arun_commands(entry.commands))
         else:
-            self.console.print(f"[color(202)]✗ Error:[/color(202)] {result['error'][:200]}")
+            self.console.print(f"[color(94)]▶ Running:[/color(94)] [color(136)]{entry.command}[/color(136)]")
+            result = await self.executor.aexecute(entry.command, state["os_info"])
+            # Add observation to history and display it
+            self._record_result(entry, result)
 
-        return state
+        self._append_history(state, entry)
+
+    def _append_history(self, state: AgentState, entry: HistoryEntry) -> None:
+        """Format a finished history entry once and keep it for later prompts"""
+        state["formatted_history"].append(self._format_entry(entry))
 
-    def _should_continue(self, state: AgentState) -> str:
+    @staticmethod
+    def _should_continue(state: AgentState) -> str:
         """Determine if we should continue or end"""
         if state["should_continue"] and state["iteration"] < state["max_iterations"]:
-            return "execute"
+            return "continue"
         else:
             return "end"
 
@@ -224,6 +377,19 @@ class ReactAgent(BaseAgent):
         """
         Main entry point to solve the user's query using LangGraph.
 
+        Args:
+            user_query: The user's question or problem
+
+        Returns:
+            Final answer string
+        """
+        return run_sync(self.asolve(user_query))
+
+    async def asolve(self, user_query: str) -> str:
+        """
+        Async variant of solve - LLM calls and commands are awaited, so several
+        queries can share one event loop.
+
         Args:
             user_query: The user's question or problem
 
@@ -232,13 +398,22 @@ class ReactAgent(BaseAgent):
         """
         log_info(f"Starting LangGraph solve for query: {user_query[:100]}")
 
+        os_info = self.system_context.get_os_info()
+        shell_info = self.system_context.get_shell_info()
+        available_commands = self.system_context.get_common_commands()
+
         # Initialize state
         initial_state: AgentState = {
             "user_query": user_query,
-            "os_info": self.system_context.get_os_info(),
-            "shell_info": self.system_context.get_shell_info(),
-            "available_commands": self.system_context.get_common_commands(),
+            "os_info": os_info,
+            "shell_info": shell_info,
+            "available_commands": available_commands,
             "history": [],
+            "formatted_history": [],
+            # Static part of the prompt - invariant for the whole solve
+            "prompt_prefix": self._render_prompt_prefix(
+                user_query, os_info, shell_info, ", ".join(available_commands[:20])
+            ),
             "iteration": 0,
             "max_iterations": self.max_iterations,
             "llm_timeout": self.llm_timeout,
@@ -247,10 +422,45 @@ class ReactAgent(BaseAgent):
         }
 
         # Run the graph
-        final_state = self.graph.invoke(initial_state)
+        graph = await self._aget_graph()
+        final_state = await graph.ainvoke(initial_state, self._run_config())
 
         return final_state["final_answer"]
 
+    def get_history(self, thread_id: Optional[str] = None) -> List[HistoryEntry]:
+        """
+        Get the history of the latest checkpoint of a thread.
+
+        Args:
+            thread_id: Checkpoint thread (default: agent.session_id)
+
+        Returns:
+            History entries, empty if checkpointing is off or nothing was saved
+        """
+        return run_sync(self.aget_history(thread_id))
+
+    async def aget_history(self, thread_id: Optional[str] = None) -> List[HistoryEntry]:
+        """
+        Async variant of get_history.
+
+        Reads the checkpoint tuple straight from the checkpointer rather than
+        through graph.aget_state, which also resolves pending tasks and next nodes.
+
+        Args:
+            thread_id: Checkpoint thread (default: agent.session_id)
+
+        Returns:
+            History entries, empty if checkpointing is off or nothing was saved
+        """
+        await self._aget_graph()
+        if self.checkpointer is None:
+            return []
+
+        checkpoint_tuple = await self.checkpointer.aget_tuple(self._run_config(thread_id))
+        if checkpoint_tuple is None:
+            return []
+        return checkpoint_tuple.checkpoint["channel_values"].get("history", [])
+
     def _generate_timeout_response_state(self, state: AgentState) -> str:
         """
         Generate response when max iterations reached (state-based version).
@@ -11,7 +11,7 @@ from .config_manager import Config
 from .agents.reactagent import ReactAgent
 from .context.system import SystemContext
 from .llm.gemini import GeminiLLM
-from .llm.ollama import OllamaLLM
+from .llm.ollama import OllamaLLM, DEFAULT_KEEP_ALIVE
 from .logger import get_logger, log_info, log_error, log_exception
 
 
@@ -56,10 +56,18 @@ def main():
                 console.print("[red]❌ Gemini API key not configured.[/red]")
                 console.print("Run: [cyan]rabbit setup[/cyan]\n")
                 return
-            llm = GeminiLLM(llm_config['api_key'], llm_config.get('model', 'gemini-pro'))
+            llm = GeminiLLM(
+                llm_config['api_key'],
+                llm_config.get('model', 'gemini-pro'),
+                timeout=llm_config.get('timeout_seconds', 30)
+            )
             log_info("Gemini LLM initialized successfully")
         else:
-            llm = OllamaLLM(llm_config.get('model', 'llama3'))
+            llm = OllamaLLM(
+                llm_config.get('model', 'llama3'),
+                timeout=llm_config.get('timeout_seconds', 30),
+                keep_alive=llm_config.get('keep_alive', DEFAULT_KEEP_ALIVE)
+            )
             log_info("Ollama LLM initialized successfully")
 
         # Quick availability check (non-blocking)
@@ -74,6 +82,9 @@ def main():
     # Initialize agent and system context
     agent = ReactAgent(llm, config)
     system_context = SystemContext()
+    if config.get('agent', {}).get('reload_context_on_sighup', False):
+        # Long-lived session - let `kill -HUP` pick up PATH/shell/OS changes
+        SystemContext.install_reload_on_sighup()
     log_info(f"Agent initialized - OS: {system_context.get_os_info()['type']}, Shell: {system_context.get_shell_info()['type']}")
 
     # Welcome message with brown theme
@@ -93,39 +104,43 @@ def main():
     history = InMemoryHistory()
     log_info("Starting interactive loop")
 
-    while True:
-        try:
-            user_input = prompt('rabbit> ', history=history)
-
-            if user_input.lower() in ['exit', 'quit', 'bye']:
-                log_info("User requested exit")
-                console.print("[dim]Goodbye![/dim]")
+    try:
+        while True:
+            try:
+                user_input = prompt('rabbit> ', history=history)
+
+                if user_input.lower() in ['exit', 'quit', 'bye']:
+                    log_info("User requested exit")
+                    console.print("[dim]Goodbye![/dim]")
+                    break
+
+                if user_input.strip() == '':
+                    continue
+
+                # Process query through agent
+                log_info(f"Processing user query: {user_input[:100]}")
+                console.print()
+                response = agent.solve(user_input)
+                log_info(f"Agent response generated (length: {len(response)} chars)")
+
+                # Display response with brown theme
+                console.print(f"\n[bold color(136)]Answer:[/bold color(136)]")
+                console.print(Markdown(response))
+                console.print()
+
+            except (EOFError, KeyboardInterrupt):
+                log_info("User interrupted (EOF/Ctrl+C)")
+                console.print("\n[dim]Goodbye![/dim]")
                 break
-
-            if user_input.strip() == '':
-                continue
-
-            # Process query through agent
-            log_info(f"Processing user query: {user_input[:100]}")
-            console.print()
-            response = agent.solve(user_input)
-            log_info(f"Agent response generated (length: {len(response)} chars)")
-
-            # Display response with brown theme
-            console.print(f"\n[bold color(136)]Answer:[/bold color(136)]")
-            console.print(Markdown(response))
-            console.print()
-
-        except (EOFError, KeyboardInterrupt):
-            log_info("User interrupted (EOF/Ctrl+C)")
-            console.print("\n[dim]Goodbye![/dim]")
-            break
-        except Exception as e:
-            log_exception(f"Error in interactive loop: {e}")
-            console.print(f"\n[red]❌ Error: {e}[/red]\n")
-            import traceback
-            if '--debug' in sys.argv:
-                traceback.print_exc()
+            except Exception as e:
+                log_exception(f"Error in interactive loop: {e}")
+                console.print(f"\n[red]❌ Error: {e}[/red]\n")
+                import traceback
+                if '--debug' in sys.argv:
+                    traceback.print_exc()
+    finally:
+        # Flush and close the checkpoint database, if any
+        agent.close()
 
 
 if __name__ == "__main__":
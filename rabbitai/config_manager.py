@@ -1,6 +1,5 @@
 """Configuration management for RabbitAI"""
 
-import yaml
 from pathlib import Path
 from typing import Dict, Any
 from .llm.ollama import OllamaLLM
@@ -19,13 +18,16 @@ class Config:
                 'model': 'gemini-pro',
                 'api_key': None,
                 'timeout_seconds': 30,  # LLM API timeout
+                'cache': True,  # Reuse decisions for identical prompts
             },
             'agent': {
                 'max_iterations': 10,  # Fixed, not configurable
+                'history_window': 5,  # Recent steps replayed in full in each prompt
             },
             'safety': {
                 'require_confirmation': True,  # Always true
                 'timeout_seconds': 30,  # Command execution timeout
+                'max_output_bytes': 65536,  # Captured stdout/stderr cap per command
             }
         }
 
@@ -34,9 +36,13 @@ class Config:
         if not self.config_file.exists():
             return self.default_config.copy()
 
+        import yaml
+        # libyaml-backed loader when PyYAML was built with it
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
         try:
             with open(self.config_file, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=loader)
                 # Merge with defaults to ensure all keys exist
                 return self._merge_with_defaults(config)
         except Exception as e:
@@ -45,9 +51,12 @@ class Config:
 
     def save(self, config: Dict[str, Any]):
         """Save configuration to file"""
+        import yaml
+        dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
         self.config_dir.mkdir(exist_ok=True)
         with open(self.config_file, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+            yaml.dump(config, f, Dumper=dumper, default_flow_style=False)
 
     def _merge_with_defaults(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Merge loaded config with defaults to ensure all keys exist"""
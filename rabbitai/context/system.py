@@ -1,19 +1,17 @@
 """System context detection for RabbitAI"""
 
+import functools
 import platform
 import os
-import subprocess
+import shutil
+import signal
+import threading
 from typing import Dict, List
 from ..command_config import COMMON_COMMANDS, LINUX_COMMANDS, MACOS_COMMANDS, WINDOWS_COMMANDS
 
 
 class SystemContext:
-    """Detects and provides system information"""
-
-    def __init__(self):
-        self._os_info = None
-        self._shell_info = None
-        self._common_commands = None
+    """Detects and provides system information (detected once per process)"""
 
     def get_os_info(self) -> Dict[str, str]:
         """
@@ -22,24 +20,7 @@ class SystemContext:
         Returns:
             Dictionary with OS details (type, version, machine)
         """
-        if self._os_info is None:
-            system = platform.system().lower()
-
-            # Normalize OS names
-            if system == "darwin":
-                os_type = "macos"
-            else:
-                os_type = system
-
-            self._os_info = {
-                'type': os_type,
-                'system': system,  # Original value for internal use
-                'version': platform.version(),
-                'release': platform.release(),
-                'machine': platform.machine(),
-                'processor': platform.processor() or 'unknown'
-            }
-        return self._os_info
+        return self._detect_os_info()
 
     def get_shell_info(self) -> Dict[str, str]:
         """
@@ -48,16 +29,7 @@ class SystemContext:
         Returns:
             Dictionary with shell details (type, path)
         """
-        if self._shell_info is None:
-            shell = os.environ.get('SHELL', '/bin/sh')
-            shell_name = os.path.basename(shell)
-
-            self._shell_info = {
-                'type': shell_name,
-                'path': shell,
-                'term': os.environ.get('TERM', 'unknown')
-            }
-        return self._shell_info
+        return self._detect_shell_info()
 
     def get_common_commands(self) -> List[str]:
         """
@@ -66,11 +38,68 @@ class SystemContext:
         Returns:
             List of command names
         """
-        if self._common_commands is not None:
-            return self._common_commands
+        return self._detect_common_commands()
 
-        os_info = self.get_os_info()
-        os_type = os_info['system']  # Use original value
+    @staticmethod
+    def invalidate() -> None:
+        """Forget the cached OS/shell/command detection so the next call re-detects"""
+        SystemContext._detect_os_info.cache_clear()
+        SystemContext._detect_shell_info.cache_clear()
+        SystemContext._detect_common_commands.cache_clear()
+
+    @staticmethod
+    def install_reload_on_sighup() -> bool:
+        """
+        Re-detect system context when the process receives SIGHUP (opt-in, for long-lived sessions).
+
+        Returns:
+            True if the handler was installed, False where SIGHUP or signal handlers are unavailable
+        """
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return False
+
+        signal.signal(signal.SIGHUP, lambda signum, frame: SystemContext.invalidate())
+        return True
+
+    @staticmethod
+    @functools.cache
+    def _detect_os_info() -> Dict[str, str]:
+        """Detect OS information (cached for the process lifetime)"""
+        system = platform.system().lower()
+
+        # Normalize OS names
+        if system == "darwin":
+            os_type = "macos"
+        else:
+            os_type = system
+
+        return {
+            'type': os_type,
+            'system': system,  # Original value for internal use
+            'version': platform.version(),
+            'release': platform.release(),
+            'machine': platform.machine(),
+            'processor': platform.processor() or 'unknown'
+        }
+
+    @staticmethod
+    @functools.cache
+    def _detect_shell_info() -> Dict[str, str]:
+        """Detect shell information (cached for the process lifetime)"""
+        shell = os.environ.get('SHELL', '/bin/sh')
+        shell_name = os.path.basename(shell)
+
+        return {
+            'type': shell_name,
+            'path': shell,
+            'term': os.environ.get('TERM', 'unknown')
+        }
+
+    @staticmethod
+    @functools.cache
+    def _detect_common_commands() -> List[str]:
+        """Detect available common commands (cached for the process lifetime)"""
+        os_type = SystemContext._detect_os_info()['system']  # Use original value
 
         # Start with common commands
         common = list(COMMON_COMMANDS)
@@ -84,10 +113,10 @@ class SystemContext:
             common.extend(WINDOWS_COMMANDS)
 
         # Filter to only commands that are actually available
-        self._common_commands = self._filter_available_commands(common)
-        return self._common_commands
+        return SystemContext._filter_available_commands(common)
 
-    def _filter_available_commands(self, commands: List[str]) -> List[str]:
+    @staticmethod
+    def _filter_available_commands(commands: List[str]) -> List[str]:
         """
         Filter command list to only those available on the system.
 
@@ -97,48 +126,23 @@ class SystemContext:
         Returns:
             List of available commands
         """
-        available = []
-        os_info = self.get_os_info()
-
-        for cmd in commands:
-            if self._command_exists(cmd, os_info['system']):
-                available.append(cmd)
+        return [cmd for cmd in commands if SystemContext._command_exists(cmd)]
 
-        return available
-
-    def _command_exists(self, command: str, os_type: str) -> bool:
+    @staticmethod
+    def _command_exists(command: str) -> bool:
         """
         Check if a command exists on the system.
 
+        Searches PATH in-process (honouring PATHEXT on Windows) instead of
+        spawning a which/where process per command.
+
         Args:
             command: Command name to check
-            os_type: Operating system type
 
         Returns:
             True if command exists, False otherwise
         """
-        try:
-            if os_type == 'windows':
-                # On Windows, use 'where' command
-                result = subprocess.run(
-                    ['where', command],
-                    capture_output=True,
-                    check=False,
-                    timeout=2
-                )
-            else:
-                # On Unix-like systems, use 'which' command
-                result = subprocess.run(
-                    ['which', command],
-                    capture_output=True,
-                    check=False,
-                    timeout=2
-                )
-
-            return result.returncode == 0
-
-        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-            return False
+        return shutil.which(command) is not None
 
     def get_summary(self) -> str:
         """
@@ -1,7 +1,8 @@
 """Base LLM interface for RabbitAI"""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator, Iterator, List, Optional
 
 
 class BaseLLM(ABC):
@@ -20,6 +21,82 @@ class BaseLLM(ABC):
         """
         pass
 
+    async def ainvoke(self, prompt: str) -> Any:
+        """
+        Async variant of invoke.
+
+        Providers with a native async client should override this; the
+        default runs the blocking invoke in a worker thread.
+
+        Args:
+            prompt: The prompt string to send
+
+        Returns:
+            Response object from the LLM (implementation-specific)
+        """
+        return await asyncio.to_thread(self.invoke, prompt)
+
+    def stream(self, prompt: str) -> Iterator[Any]:
+        """
+        Stream the response to a prompt chunk by chunk.
+
+        Providers with native streaming should override this; the default
+        yields the whole response as a single chunk.
+
+        Args:
+            prompt: The prompt string to send
+
+        Yields:
+            Response chunks with a .content string
+        """
+        yield self.invoke(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[Any]:
+        """
+        Async variant of stream.
+
+        Args:
+            prompt: The prompt string to send
+
+        Yields:
+            Response chunks with a .content string
+        """
+        yield await self.ainvoke(prompt)
+
+    def invoke_batch(self, prompts: List[str], max_concurrency: Optional[int] = None) -> List[Any]:
+        """
+        Send several independent prompts and get all responses.
+
+        Providers that can multiplex requests should override this; the
+        default sends the prompts one after another.
+
+        Args:
+            prompts: The prompt strings to send
+            max_concurrency: Upper bound on in-flight requests (None = provider default)
+
+        Returns:
+            Response objects, in the same order as prompts
+        """
+        return [self.invoke(prompt) for prompt in prompts]
+
+    def with_structured_output(self, schema: Any) -> Any:
+        """
+        Get a runnable whose responses are parsed into schema by the provider.
+
+        Providers with native structured output (constrained decoding) should
+        override this; callers fall back to parsing the raw text otherwise.
+
+        Args:
+            schema: Pydantic model describing the response
+
+        Returns:
+            Runnable returning schema instances
+
+        Raises:
+            NotImplementedError: If the provider has no structured output support
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support structured output")
+
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -1,27 +1,77 @@
 """Gemini LLM integration for RabbitAI"""
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import functools
+import urllib.request
+import weakref
+from typing import List, Optional
 from .base import BaseLLM
 
+# Model metadata endpoint - answers without generating any tokens
+GEMINI_MODELS_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}"
+
+# ReAct decision format - enforced at decode time so responses are always bare, valid JSON
+DECISION_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "thought": {"type": "string"},
+        "action": {"type": "string", "enum": ["execute_command", "execute_commands", "final_answer"]},
+        "command": {"type": "string"},
+        "commands": {"type": "array", "items": {"type": "string"}},
+        "answer": {"type": "string"}
+    },
+    "required": ["action", "thought"]
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_client(model: str, api_key: str, timeout: Optional[int]):
+    """
+    Get the process-wide chat model for a model/key/timeout combination.
+
+    The client owns the gRPC channel to the Gemini API; sharing it lets every
+    GeminiLLM (and every query in solve_many) reuse the open TLS connection.
+    Async calls use per-event-loop copies instead (see GeminiLLM._async_llm).
+    """
+    # Imported here so CLI startup (setup, --help) doesn't pay for the langchain import chain
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=api_key,
+        temperature=0.25,
+        request_timeout=timeout,
+        response_mime_type="application/json",
+        response_schema=DECISION_RESPONSE_SCHEMA,
+        convert_system_message_to_human=True  # Gemini compatibility
+    )
+
 
 class GeminiLLM(BaseLLM):
     """Google Gemini LLM implementation"""
 
-    def __init__(self, api_key: str, model: str = "gemini-pro"):
+    def __init__(self, api_key: str, model: str = "gemini-pro", timeout: Optional[int] = None):
         """
         Initialize Gemini LLM.
 
         Args:
             api_key: Google API key for Gemini
             model: Model name (default: gemini-pro)
+            timeout: Request timeout in seconds, enforced by the client (default: none)
         """
         self.model_name = model
-        self.llm = ChatGoogleGenerativeAI(
-            model=model,
-            google_api_key=api_key,
-            temperature=0.25,
-            convert_system_message_to_human=True  # Gemini compatibility
-        )
+        self.api_key = api_key
+        self.llm = _shared_client(model, api_key, timeout)
+        # The gRPC aio client binds to the event loop it is first used on, so async
+        # calls go through a copy per loop (the sync client stays shared)
+        self._loop_llms = weakref.WeakKeyDictionary()
+
+    def _async_llm(self):
+        """Get the chat model whose async client belongs to the running event loop"""
+        loop = asyncio.get_running_loop()
+        llm = self._loop_llms.get(loop)
+        if llm is None:
+            llm = self._loop_llms[loop] = self.llm.model_copy(update={"async_client_running": None})
+        return llm
 
     def invoke(self, prompt: str):
         """
@@ -35,6 +85,88 @@ class GeminiLLM(BaseLLM):
         """
         return self.llm.invoke(prompt)
 
+    async def ainvoke(self, prompt: str):
+        """
+        Send a prompt to Gemini without blocking the event loop.
+
+        Args:
+            prompt: The prompt string
+
+        Returns:
+            LangChain message response object
+        """
+        return await self._async_llm().ainvoke(prompt)
+
+    def stream(self, prompt: str):
+        """
+        Stream a Gemini response chunk by chunk.
+
+        Args:
+            prompt: The prompt string
+
+        Yields:
+            LangChain message chunks
+        """
+        yield from self.llm.stream(prompt)
+
+    async def astream(self, prompt: str):
+        """
+        Async variant of stream.
+
+        Args:
+            prompt: The prompt string
+
+        Yields:
+            LangChain message chunks
+        """
+        async for chunk in self._async_llm().astream(prompt):
+            yield chunk
+
+    def invoke_batch(self, prompts: List[str], max_concurrency: Optional[int] = None) -> list:
+        """
+        Send several prompts to Gemini concurrently via LangChain's batch.
+
+        Args:
+            prompts: The prompt strings
+            max_concurrency: Upper bound on in-flight requests (None = LangChain default)
+
+        Returns:
+            LangChain message response objects, in the same order as prompts
+        """
+        config = {"max_concurrency": max_concurrency} if max_concurrency else None
+        return self.llm.batch(prompts, config=config)
+
+    def with_structured_output(self, schema):
+        """
+        Get a runnable that decodes Gemini responses straight into schema.
+
+        Uses JSON mode with the schema as response_schema (constrained
+        decoding) rather than function calling, which Gemini rejects in
+        combination with a JSON response MIME type.
+
+        Args:
+            schema: Pydantic model describing the response
+
+        Returns:
+            Runnable returning schema instances
+        """
+        from langchain_core.runnables import RunnableLambda
+
+        loop_runnables = weakref.WeakKeyDictionary()
+
+        async def ainvoke(prompt):
+            # Built per event loop, like _async_llm
+            loop = asyncio.get_running_loop()
+            runnable = loop_runnables.get(loop)
+            if runnable is None:
+                runnable = loop_runnables[loop] = self._async_llm().with_structured_output(
+                    schema, method="json_mode"
+                )
+            return await runnable.ainvoke(prompt)
+
+        sync_runnable = self.llm.with_structured_output(schema, method="json_mode")
+        return RunnableLambda(sync_runnable.invoke, afunc=ainvoke)
+
     def is_available(self) -> bool:
         """
         Check if Gemini is available and configured correctly.
@@ -43,9 +175,13 @@ class GeminiLLM(BaseLLM):
             True if Gemini can be used, False otherwise
         """
         try:
-            # Test with a simple query
-            response = self.llm.invoke("Hello")
-            return response is not None
+            # Look up the model instead of generating - validates key and model name, costs no quota
+            request = urllib.request.Request(
+                GEMINI_MODELS_URL.format(model=self.model_name),
+                headers={"x-goog-api-key": self.api_key}
+            )
+            with urllib.request.urlopen(request, timeout=2) as response:
+                return response.status == 200
         except Exception as e:
             print(f"Gemini availability check failed: {e}")
             return False
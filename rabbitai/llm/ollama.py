@@ -1,29 +1,55 @@
 """Ollama LLM integration for RabbitAI"""
 
-from langchain_community.chat_models import ChatOllama
 from .base import BaseLLM
+import asyncio
+import functools
+import json
 import subprocess
-from typing import List
+import urllib.request
+from typing import List, Optional
+
+
+# How long the server keeps the model (and its prompt KV cache) loaded between requests
+DEFAULT_KEEP_ALIVE = "30m"
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_client(model: str, base_url: str, timeout: Optional[int], keep_alive: str):
+    """Get the process-wide chat model for a model/server/timeout/keep-alive combination"""
+    # Imported here so CLI startup (setup, --help) doesn't pay for the langchain import chain
+    from langchain_community.chat_models import ChatOllama
+    return ChatOllama(
+        model=model,
+        base_url=base_url,
+        temperature=0.1,  # Low temperature for more deterministic responses
+        format="json",  # Constrain output to valid JSON (the ReAct decision format)
+        keep_alive=keep_alive,
+        timeout=timeout
+    )
 
 
 class OllamaLLM(BaseLLM):
     """Ollama local LLM implementation"""
 
-    def __init__(self, model: str = "llama3", base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "llama3", base_url: str = "http://localhost:11434",
+                 timeout: Optional[int] = None, keep_alive: str = DEFAULT_KEEP_ALIVE):
         """
         Initialize Ollama LLM.
 
+        Ollama reuses the KV cache of the longest matching prompt prefix while
+        the model stays loaded. ReAct prompts start with a static prefix (system
+        info + instructions), so keeping the model resident across iterations and
+        queries means only the new history suffix is re-processed.
+
         Args:
             model: Model name (e.g., llama3, codellama, mistral)
             base_url: Ollama server URL (default: http://localhost:11434)
+            timeout: Request timeout in seconds, enforced by the client (default: none)
+            keep_alive: How long the server keeps the model loaded (default: 30m)
         """
         self.model_name = model
         self.base_url = base_url
-        self.llm = ChatOllama(
-            model=model,
-            base_url=base_url,
-            temperature=0.1  # Low temperature for more deterministic responses
-        )
+        self.llm = _shared_client(model, base_url, timeout, keep_alive)
 
     def invoke(self, prompt: str):
         """
@@ -37,6 +63,72 @@ class OllamaLLM(BaseLLM):
         """
         return self.llm.invoke(prompt)
 
+    async def ainvoke(self, prompt: str):
+        """
+        Send a prompt to Ollama without blocking the event loop.
+
+        Args:
+            prompt: The prompt string
+
+        Returns:
+            LangChain message response object
+        """
+        return await self.llm.ainvoke(prompt)
+
+    def stream(self, prompt: str):
+        """
+        Stream a Ollama response chunk by chunk.
+
+        Args:
+            prompt: The prompt string
+
+        Yields:
+            LangChain message chunks
+        """
+        yield from self.llm.stream(prompt)
+
+    async def astream(self, prompt: str):
+        """
+        Async variant of stream.
+
+        Args:
+            prompt: The prompt string
+
+        Yields:
+            LangChain message chunks
+        """
+        async for chunk in self.llm.astream(prompt):
+            yield chunk
+
+    def invoke_batch(self, prompts: List[str], max_concurrency: Optional[int] = None) -> list:
+        """
+        Send several prompts to Ollama concurrently.
+
+        ChatOllama has no native batching, so the async requests are
+        gathered on a private event loop.
+
+        Args:
+            prompts: The prompt strings
+            max_concurrency: Upper bound on in-flight requests (None = unbounded)
+
+        Returns:
+            LangChain message response objects, in the same order as prompts
+        """
+        return asyncio.run(self._ainvoke_all(prompts, max_concurrency))
+
+    async def _ainvoke_all(self, prompts: List[str], max_concurrency: Optional[int]) -> list:
+        """Gather ainvoke calls, optionally bounded by a semaphore"""
+        if not max_concurrency:
+            return list(await asyncio.gather(*(self.ainvoke(prompt) for prompt in prompts)))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _bounded(prompt: str):
+            async with semaphore:
+                return await self.ainvoke(prompt)
+
+        return list(await asyncio.gather(*(_bounded(prompt) for prompt in prompts)))
+
     def is_available(self) -> bool:
         """
         Check if Ollama is available and the model is accessible.
@@ -45,9 +137,16 @@ class OllamaLLM(BaseLLM):
             True if Ollama can be used, False otherwise
         """
         try:
-            # Test with a simple query
-            response = self.llm.invoke("Hello")
-            return response is not None
+            # List installed models instead of generating - no model load, no tokens
+            with urllib.request.urlopen(f"{self.base_url}/api/tags", timeout=2) as response:
+                tags = json.load(response)
+
+            names = {model.get("name", "") for model in tags.get("models", [])}
+            if self.model_name in names or f"{self.model_name}:latest" in names:
+                return True
+
+            print(f"Ollama model '{self.model_name}' is not installed: ollama pull {self.model_name}")
+            return False
         except Exception as e:
             print(f"Ollama availability check failed: {e}")
             print(f"Make sure Ollama is running: ollama serve")
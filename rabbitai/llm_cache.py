@@ -0,0 +1,151 @@
+"""Prompt -> decision cache for RabbitAI agents"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    # Optional speedup - orjson serializes in C and returns bytes ready for hashing
+    import orjson
+
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+
+class LLMCache:
+    """
+    LRU cache of parsed LLM decisions, keyed by model and prompt.
+
+    Entries live in memory; when a database path is given they are also
+    written to SQLite so they survive across CLI runs.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_secs: Optional[float] = 3600,
+                 db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries (least recently used are evicted)
+            ttl_secs: Seconds an entry stays valid (None = never expires)
+            db_path: Optional SQLite file for a persistent second level
+        """
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        # key -> (stored_at, decision)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db = None
+        # get/put run on whichever thread is solving - one lock guards both levels
+        self._lock = threading.Lock()
+
+        if db_path:
+            path = Path(db_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, stored_at REAL, value TEXT)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def cache_key(llm, prompt: Any) -> str:
+        """
+        Build the cache key for a prompt sent to a model.
+
+        Args:
+            llm: LLM instance the prompt is sent to
+            prompt: Fully formatted prompt (string or list of chat messages)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        if not isinstance(prompt, str):
+            prompt = [[message.type, message.content] for message in prompt]
+        return hashlib.sha256(_dumps({"model": llm.get_model_name(), "prompt": prompt})).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached decision.
+
+        Args:
+            key: Key from cache_key
+
+        Returns:
+            Copy of the cached decision, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT stored_at, value FROM decisions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], _loads(row[1]))
+                    self._remember(key, entry)
+
+            if entry is None:
+                return None
+
+            stored_at, decision = entry
+            if self._expired(stored_at):
+                self._forget(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return dict(decision)
+
+    def put(self, key: str, decision: Dict[str, Any]) -> None:
+        """
+        Store a parsed decision.
+
+        Args:
+            key: Key from cache_key
+            decision: Parsed decision dictionary
+        """
+        entry = (time.time(), dict(decision))
+        with self._lock:
+            self._remember(key, entry)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO decisions (key, stored_at, value) VALUES (?, ?, ?)",
+                    (key, entry[0], _dumps(entry[1]).decode("utf-8"))
+                )
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite level, if any (the in-memory level keeps working)"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        """Drop an entry from every level"""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM decisions WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _expired(self, stored_at: float) -> bool:
+        """Check whether an entry stored at stored_at is past its TTL"""
+        return self.ttl_secs is not None and time.time() - stored_at > self.ttl_secs
@@ -0,0 +1,48 @@
+"""Fast text scans over captured command output"""
+
+from typing import List, Optional
+
+# Substrings that mark an observation as diagnostically interesting
+DIAGNOSTIC_SIGNALS = ("error", "fail", "warn", "denied", "refused", "not found", "timed out")
+
+
+def signal_score(text: str) -> int:
+    """
+    Count occurrences of diagnostic signals (errors, warnings, ...) in text.
+
+    Args:
+        text: Command output or error text
+
+    Returns:
+        Total number of signal matches (case-insensitive)
+    """
+    if not text:
+        return 0
+    lowered = text.lower()
+    return sum(lowered.count(signal) for signal in DIAGNOSTIC_SIGNALS)
+
+
+def most_significant_command(history: List) -> Optional[str]:
+    """
+    Pick the command whose result carries the most diagnostic signals.
+
+    Args:
+        history: Agent HistoryEntry records
+
+    Returns:
+        The highest-scoring command, or None if no result contains any signal
+    """
+    best, best_score = None, 0
+    for entry in history:
+        if entry.results is not None:
+            observations = zip(entry.commands, entry.results)
+        elif entry.result is not None:
+            observations = ((entry.command, entry.result),)
+        else:
+            continue
+
+        for command, result in observations:
+            score = signal_score(result.output) + signal_score(result.error)
+            if score > best_score:
+                best, best_score = command, score
+    return best
@@ -1,12 +1,31 @@
 """Command execution tool with safety checks for RabbitAI"""
 
-import subprocess
+import asyncio
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from rich.console import Console
 from ..logger import log_info, log_debug, log_warning
 from ..command_config import DANGEROUS_PATTERNS, SAFE_COMMANDS, WRITE_INDICATORS
 
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024
+
+# Appended (stdout) or prepended (stderr) when captured output was cut off
+TRUNCATION_MARKER = b"...[output truncated]"
+
+# All dangerous patterns as one alternation, compiled once - a single scan per command
+DANGEROUS_RE = re.compile("|".join(f"(?:{pattern})" for pattern in DANGEROUS_PATTERNS), re.IGNORECASE)
+
+# Lower-cased SAFE_COMMANDS prefixes for a single str.startswith call
+SAFE_PREFIXES = tuple(command.lower() for command in SAFE_COMMANDS)
+
+# Common read-only programs, safe to run without confirmation when invoked without shell syntax
+READ_ONLY_PROGRAMS = frozenset({
+    "ls", "cat", "df", "free", "uname", "ps", "whoami", "pwd", "echo", "uptime", "who", "w", "id",
+})
+
+# Characters that chain, redirect or substitute in a shell command line
+SHELL_METACHARACTERS = frozenset(";&|<>$`()\n")
+
 
 class CommandExecutor:
     """Executes shell commands with safety checks and user confirmation"""
@@ -21,11 +40,14 @@ class CommandExecutor:
         self.config = config
         self.timeout = config.get('safety', {}).get('timeout_seconds', 30)
         self.require_confirmation = config.get('safety', {}).get('require_confirmation', True)
+        # Upper bound on captured stdout/stderr - agents only ever show a few hundred characters
+        self.max_output_bytes = config.get('safety', {}).get('max_output_bytes', DEFAULT_MAX_OUTPUT_BYTES)
         self.console = Console()
         log_info(f"CommandExecutor initialized - timeout={self.timeout}s, require_confirmation={self.require_confirmation}")
 
         # Import safety patterns from config
         self.dangerous_patterns = DANGEROUS_PATTERNS
+        self.dangerous_re = DANGEROUS_RE
         self.safe_commands = SAFE_COMMANDS
         self.write_indicators = WRITE_INDICATORS
 
@@ -45,6 +67,40 @@ class CommandExecutor:
             - returncode: int - exit code
             - blocked: bool - whether command was blocked
         """
+        blocked = self.preflight(command)
+        if blocked is not None:
+            return blocked
+
+        # Execute command
+        return self._run_command(command)
+
+    async def aexecute(self, command: str, os_info: Dict) -> Dict[str, Any]:
+        """
+        Async variant of execute - the command runs without blocking the event loop.
+
+        Args:
+            command: The command to execute
+            os_info: Operating system information
+
+        Returns:
+            Dictionary with execution results (same shape as execute)
+        """
+        blocked = self.preflight(command)
+        if blocked is not None:
+            return blocked
+
+        return await self.arun(command)
+
+    def preflight(self, command: str) -> Optional[Dict[str, Any]]:
+        """
+        Run safety checks and user confirmation for a command.
+
+        Args:
+            command: The command to check
+
+        Returns:
+            A blocked execution result if the command must not run, None if it may run
+        """
         # Validate command is not empty
         if not command or not command.strip():
             return {
@@ -81,8 +137,21 @@ class CommandExecutor:
                 }
             log_info("User confirmed command execution")
 
-        # Execute command
-        return self._run_command(command)
+        return None
+
+    def needs_confirmation(self, command: str) -> bool:
+        """
+        Check whether preflight will prompt the user before running a command.
+
+        Args:
+            command: Command to check
+
+        Returns:
+            True if the user will be asked to confirm
+        """
+        if not command or not command.strip() or self._is_dangerous(command):
+            return False
+        return self.require_confirmation and not self._is_safe_command(command)
 
     def _is_dangerous(self, command: str) -> bool:
         """
@@ -94,10 +163,7 @@ class CommandExecutor:
         Returns:
             True if dangerous, False otherwise
         """
-        for pattern in self.dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return True
-        return False
+        return self.dangerous_re.search(command) is not None
 
     def _is_safe_command(self, command: str) -> bool:
         """
@@ -109,11 +175,13 @@ class CommandExecutor:
         Returns:
             True if safe, False otherwise
         """
-        command_lower = command.strip().lower()
+        # Fast path - a plain invocation of a common read-only program
+        parts = command.split(None, 1)
+        if parts and parts[0] in READ_ONLY_PROGRAMS and SHELL_METACHARACTERS.isdisjoint(command):
+            return True
 
-        for safe_cmd in self.safe_commands:
-            if command_lower.startswith(safe_cmd.lower()):
-                return True
+        if command.strip().lower().startswith(SAFE_PREFIXES):
+            return True
 
         # Additional heuristic: if command has no write indicators
         return self._is_read_only_heuristic(command)
@@ -135,41 +203,76 @@ class CommandExecutor:
         """
         Execute the command and capture output.
 
+        Runs arun on a private event loop, so output is read through the same
+        capped readers and never held in memory in full.
+
         Args:
             command: Command to execute
 
+        Returns:
+            Dictionary with execution results
+        """
+        return asyncio.run(self.arun(command))
+
+    async def arun(self, command: str) -> Dict[str, Any]:
+        """
+        Execute an already-checked command asynchronously and capture output.
+
+        Args:
+            command: Command to execute (must have passed preflight)
+
         Returns:
             Dictionary with execution results
         """
         try:
-            log_debug(f"Executing command: {command}")
-            result = subprocess.run(
+            log_debug(f"Executing command (async): {command}")
+            process = await asyncio.create_subprocess_shell(
                 command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
 
-            log_debug(f"Command completed: returncode={result.returncode}, stdout_len={len(result.stdout)}, stderr_len={len(result.stderr)}")
+            # Read both pipes concurrently, keeping at most max_output_bytes of each
+            reads = asyncio.gather(
+                self._read_capped(process.stdout),
+                self._read_capped(process.stderr, keep_tail=True),
+                process.wait()
+            )
+            try:
+                stdout, stderr, _ = await asyncio.wait_for(reads, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                log_warning(f"Command timeout after {self.timeout}s: {command}")
+                return {
+                    "success": False,
+                    "output": "",
+                    "error": f"Command timed out after {self.timeout} seconds",
+                    "returncode": -1,
+                    "blocked": False
+                }
+            except asyncio.CancelledError:
+                # Not an Exception - without this a cancelled (e.g. speculative) command keeps running
+                process.kill()
+                await process.wait()
+                if reads.done() and not reads.cancelled():
+                    # Retrieve the reads' own CancelledError so asyncio doesn't log it
+                    reads.exception()
+                log_debug(f"Command cancelled: {command}")
+                raise
+
+            output = stdout.decode(errors="replace")
+            error = stderr.decode(errors="replace")
+            log_debug(f"Command completed: returncode={process.returncode}, stdout_len={len(output)}, stderr_len={len(error)}")
 
             return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-                "returncode": result.returncode,
+                "success": process.returncode == 0,
+                "output": output,
+                "error": error,
+                "returncode": process.returncode,
                 "blocked": False
             }
 
-        except subprocess.TimeoutExpired:
-            log_warning(f"Command timeout after {self.timeout}s: {command}")
-            return {
-                "success": False,
-                "output": "",
-                "error": f"Command timed out after {self.timeout} seconds",
-                "returncode": -1,
-                "blocked": False
-            }
         except Exception as e:
             log_warning(f"Command execution error: {e} (command: {command})")
             return {
@@ -180,6 +283,38 @@ class CommandExecutor:
                 "blocked": False
             }
 
+    async def _read_capped(self, stream: asyncio.StreamReader, keep_tail: bool = False) -> bytes:
+        """
+        Drain a subprocess pipe while holding at most max_output_bytes in memory.
+
+        Args:
+            stream: stdout or stderr of the process
+            keep_tail: Keep the end of the stream instead of the start
+
+        Returns:
+            Captured bytes, with a truncation marker if anything was dropped
+        """
+        limit = self.max_output_bytes
+        kept = bytearray()
+        total = 0
+        while True:
+            # Keep draining past the limit so the process never blocks on a full pipe
+            chunk = await stream.read(64 * 1024)
+            if not chunk:
+                break
+            total += len(chunk)
+            if keep_tail:
+                kept += chunk
+                del kept[:-limit]
+            elif len(kept) < limit:
+                kept += chunk[:limit - len(kept)]
+
+        if total <= limit:
+            return bytes(kept)
+        if keep_tail:
+            return TRUNCATION_MARKER + b"\n" + bytes(kept)
+        return bytes(kept) + b"\n" + TRUNCATION_MARKER
+
     def _get_user_confirmation(self, command: str) -> bool:
         """
         Ask user to confirm command execution.